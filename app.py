@@ -1,6 +1,7 @@
 import os
 import sys
 import numpy as np
+import pandas as pd
 import dash
 import dash_leaflet as dl
 import dash_leaflet.express as dlx
@@ -8,9 +9,13 @@ import osmnx as ox
 from dash import html, dcc
 from dash.dependencies import Input, Output, State
 import dash_bootstrap_components as dbc
-import json
+import orjson
 from dash_extensions.javascript import assign, arrow_function
 import geopandas as gpd
+from shapely.geometry import shape, mapping
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from cachelib import FileSystemCache
 
 # from geopy.geocoders import Nominatim
 import warnings
@@ -27,6 +32,15 @@ headers = {
 
 requests.utils.default_headers().update(headers)
 
+# Shared session so reverse geocodes reuse the same identifying headers and
+# keep-alive connections; the pool covers one connection per worker thread
+nominatim_session = requests.Session()
+nominatim_session.headers.update(headers)
+nominatim_session.mount(
+    "https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=8)
+)
+NOMINATIM_TIMEOUT = 15
+
 # Adjust working directory and sys.path
 current_dir = os.getcwd().split("/")[-1]
 if current_dir in ("notebooks", "src"):
@@ -43,39 +57,133 @@ from src.poi_queries import (
 )
 
 
+# Geocodes persist across restarts and workers; Nominatim allows 1 req/sec
+geocode_cache = FileSystemCache(
+    os.path.join(".cache", "geocode"), threshold=1024, default_timeout=0
+)
+
+# Overpass is the slowest step; POI results per placename keep for a week
+POI_CACHE_TIMEOUT = 7 * 24 * 60 * 60
+poi_cache = FileSystemCache(
+    os.path.join(".cache", "poi"), threshold=1024, default_timeout=POI_CACHE_TIMEOUT
+)
+
 first_time = True
 DEFAULT_PLACENAME = "Denver, CO"
 DEFAULT_SVI_VARIABLE = "E_POV150"
+# SVI fields kept as numpy columns for styling (AREA_SQMI feeds POP_DENSITY)
+SVI_KEYS = [
+    "E_TOTPOP",
+    "E_POV150",
+    "E_UNINSUR",
+    "E_LIMENG",
+    "E_MINRTY",
+    "E_MOBILE",
+    "E_NOVEH",
+    "EPL_POV150",
+    "RPL_THEME1",
+    "RPL_THEMES",
+    "AREA_SQMI",
+]
 LEAFLET_CRS = 3857
+SIMPLIFY_TOLERANCE = 0.0005  # degrees, roughly 50m
+COLORSCALE = [
+    "#FFEDA0",
+    "#FED976",
+    "#FEB24C",
+    "#FD8D3C",
+    "#FC4E2A",
+    "#E31A1C",
+    "#BD0026",
+    "#800026",
+]
+FIXED_CLASSES = np.linspace(0, 1.001, len(COLORSCALE) + 1).tolist()
 # Dash app setup
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 server = app.server
 
 
+# JavaScript function to handle styling based on properties
+choropleth_style_handle = assign(
+    """function(feature, context){
+    const {colorscale, style} = context.hideout;  // get props from hideout
+    const bin = feature.properties._bin;  // palette index precomputed server side
+    if (bin == null) {
+        style.fillColor= '#808080';  
+        return style;
+    }
+    style.fillColor = colorscale[bin];
+    return style;
+}"""
+)
+
+# JavaScript function drawing each POI as a circle marker styled by the hideout
+poi_point_to_layer = assign(
+    """function(feature, latlng, context){
+    const {color, radius} = context.hideout;
+    return L.circleMarker(latlng, {radius: radius, color: color, fill: true, fillOpacity: 0.5});
+}"""
+)
+
+
 def clean_invalid_values(geojson, invalid_value=-999):
-    for record in geojson["features"]:
-        for key in record["properties"].keys():
-            if record["properties"][key] == -999:
-                record["properties"][key] = np.nan
+    # mask every property column in one vectorized pass, then write back
+    features = geojson["features"]
+    properties = pd.DataFrame([feature["properties"] for feature in features])
+    properties = properties.mask(properties == invalid_value, np.nan)
+    for feature, record in zip(features, properties.to_dict(orient="records")):
+        feature["properties"] = record
     return geojson
 
 
-# Load GeoJSON data from file
-def create_geo_json_data(location_state, gdf=False):
+def simplify_geometries(geojson, tolerance=SIMPLIFY_TOLERANCE):
+    # Douglas-Peucker in GEOS; sub-pixel tract vertices never reach Leaflet
+    features = geojson["features"]
+    geometry = gpd.GeoSeries([shape(feature["geometry"]) for feature in features])
+    geometry = geometry.simplify(tolerance, preserve_topology=True)
+    for feature, geom in zip(features, geometry):
+        feature["geometry"] = mapping(geom)
+    return geojson
+
+
+# Parsed and cleaned once per state file; callers share the cached dict
+# read-only, so it must not be mutated downstream
+@lru_cache(maxsize=56)
+def load_state_data(file_path):
+    if file_path.endswith(".parquet"):
+        # GeoParquet copy written by src/geojson_to_parquet.py
+        state_gdf = gpd.read_parquet(file_path)
+        state_gdf["geometry"] = state_gdf.geometry.simplify(
+            SIMPLIFY_TOLERANCE, preserve_topology=True
+        )
+        geojson_data = state_gdf.__geo_interface__
+    else:
+        with open(file_path, "rb") as f:
+            geojson_data = simplify_geometries(orjson.loads(f.read()))
+    geojson_data = clean_invalid_values(geojson_data)
+
+    # column-wise (float32) copy of the SVI values so styling, binning and
+    # any analytics reduce over contiguous numpy buffers, not feature dicts
+    properties = pd.DataFrame(
+        [feature["properties"] for feature in geojson_data["features"]],
+        columns=SVI_KEYS,
+    ).astype(np.float32)
+    svi_columns = {key: properties[key].to_numpy() for key in SVI_KEYS}
+
+    return geojson_data, svi_columns
+
+
+def find_geo_json_file(location_state):
     filename = f"geo_json_{location_state.lower()}.json"
     primary_path = os.path.join("data", filename)
     fallback_path = os.path.join("src", "data", filename)
     for file_path in [primary_path, fallback_path]:
-        try:
-            if gdf:
-                return gpd.from_file(file_path)
-            with open(file_path) as f:
-                geojson_data = json.load(f)
-                # Clean invalid values after loading
-                return clean_invalid_values(geojson_data)
-
-        except FileNotFoundError:
-            continue
+        # prefer the binary GeoParquet copy when it has been generated
+        parquet_path = os.path.splitext(file_path)[0] + ".parquet"
+        if os.path.exists(parquet_path):
+            return parquet_path
+        if os.path.exists(file_path):
+            return file_path
 
     # If we get here, neither path worked
     raise FileNotFoundError(
@@ -84,23 +192,67 @@ def create_geo_json_data(location_state, gdf=False):
     )
 
 
-# Helper to convert POI GeoDataFrame to leaflet markers
+# Load GeoJSON data from file
+def create_geo_json_data(location_state, gdf=False):
+    file_path = find_geo_json_file(location_state)
+    if gdf:
+        if file_path.endswith(".parquet"):
+            return gpd.read_parquet(file_path)
+        return gpd.read_file(file_path)
+    geojson_data, _ = load_state_data(file_path)
+    return geojson_data
+
+
+def create_svi_columns(location_state):
+    _, svi_columns = load_state_data(find_geo_json_file(location_state))
+    return svi_columns
+
+
+# Helper to convert POI GeoDataFrame to a single clustered leaflet layer
 def poi_to_markers(poi_gdf, color, radius):
     # print("POI Geometry:", poi_gdf["geometry"].head())  # Debugging
-    markers = [
-        dl.CircleMarker(
-            center=[
-                geom.y,
-                geom.x,
-            ],  # Extract latitude (y) and longitude (x) from the geometry
-            color=color,
-            radius=radius,
-            fill=True,
-            fillOpacity=0.5,
-        )
-        for geom in poi_gdf.geometry
-    ]
-    return markers
+    # Extract latitude (y) and longitude (x) for all points in one pass
+    ys = poi_gdf.geometry.y.to_numpy()
+    xs = poi_gdf.geometry.x.to_numpy()
+    data = dlx.dicts_to_geojson(
+        [dict(lat=y, lon=x) for y, x in zip(ys.tolist(), xs.tolist())]
+    )
+    return dl.GeoJSON(
+        data=data,
+        cluster=True,
+        superClusterOptions={"radius": 60},
+        pointToLayer=poi_point_to_layer,
+        hideout=dict(color=color, radius=radius),
+    )
+
+
+def _disk_cached_geocode(geocoder, placename):
+    key = f"{geocoder.__name__}:{placename}"
+    result = geocode_cache.get(key)
+    if result is None:
+        result = geocoder(placename)
+        geocode_cache.set(key, result)
+    return result
+
+
+@lru_cache(maxsize=1024)
+def cached_geocode(placename):
+    return _disk_cached_geocode(ox.geocode, placename)
+
+
+@lru_cache(maxsize=1024)
+def cached_geocode_to_gdf(placename):
+    return _disk_cached_geocode(ox.geocode_to_gdf, placename)
+
+
+def _poi_cached(query, placename):
+    key = f"{query.__name__}:{placename.lower()}"
+    poi_gdf = poi_cache.get(key)
+    if poi_gdf is None:
+        # only the point geometry is needed to draw the markers
+        poi_gdf = query(placename, centroids_only=True)[["geometry"]]
+        poi_cache.set(key, poi_gdf)
+    return poi_gdf
 
 
 def find_center_of_location(grocery):
@@ -109,10 +261,11 @@ def find_center_of_location(grocery):
     return center
 
 
-def find_state(center):
-
-    url = f"https://nominatim.openstreetmap.org/reverse?format=json&lat={center[0]}&lon={center[1]}&zoom=10&addressdetails=1"
-    response = requests.get(url, headers=headers)
+@lru_cache(maxsize=4096)
+def _reverse_geocode_state(lat, lon):
+    url = f"https://nominatim.openstreetmap.org/reverse?format=json&lat={lat}&lon={lon}&zoom=10&addressdetails=1"
+    response = nominatim_session.get(url, timeout=NOMINATIM_TIMEOUT)
+    response.raise_for_status()
     data = response.json()
     address = data.get("address", {})
     state_code = address.get("ISO3166-2-lvl4", "").split("-")[-1]
@@ -120,42 +273,39 @@ def find_state(center):
     return state_code
 
 
-def generate_style_handle(svi, geojson_data):
+def find_state(center, fallback=""):
+    # Round to a ~0.1 degree grid so pans within a state hit the cache
+    # instead of Nominatim (1 req/sec usage policy)
+    # On a failed lookup return the caller's fallback (the session's last
+    # rendered state); nothing here is shared between sessions
+    try:
+        return _reverse_geocode_state(
+            round(float(center[0]), 1), round(float(center[1]), 1)
+        )
+    except (requests.RequestException, ValueError) as e:
+        print(f"Error reverse geocoding {center}: {e}")
+        return fallback
+
 
+def svi_values(svi, svi_columns):
     if svi == "POP_DENSITY":
-        e_totpop = [
-            feature["properties"]["E_TOTPOP"] for feature in geojson_data["features"]
-        ]
-        area_sqmi = [
-            feature["properties"]["AREA_SQMI"] for feature in geojson_data["features"]
-        ]
-        properties_values = [a / b for a, b in zip(e_totpop, area_sqmi)]
-    else:
-        properties_values = [
-            feature["properties"][svi]
-            for feature in geojson_data["features"]
-            if feature["properties"][svi] != -999
-        ]
-    if svi.startswith("E_"):
-        properties_max = max(properties_values)
-    elif svi.startswith("EPL_") or svi.startswith("RPL_") or svi.startswith("EP_"):
-        properties_max = 1.0
-    properties_min = 0  # min(properties_values)
-    colorscale = [
-        "#FFEDA0",
-        "#FED976",
-        "#FEB24C",
-        "#FD8D3C",
-        "#FC4E2A",
-        "#E31A1C",
-        "#BD0026",
-        "#800026",
-        
-    ]
+        return svi_columns["E_TOTPOP"] / svi_columns["AREA_SQMI"]
+    return svi_columns[svi]
+
 
-    classes = np.linspace(
-        properties_min, properties_max * 1.001, len(colorscale) + 1
-    ).tolist()
+def generate_style_handle(svi, svi_columns):
+
+    properties_min = 0  # min(properties_values)
+    colorscale = COLORSCALE
+    if svi.startswith(("EPL_", "RPL_", "EP_")):
+        # percentiles always span [0, 1], so their class edges never change
+        properties_max = 1.0
+        classes = FIXED_CLASSES
+    elif svi.startswith("E_"):
+        properties_max = float(np.nanmax(svi_values(svi, svi_columns)))
+        classes = np.linspace(
+            properties_min, properties_max * 1.001, len(colorscale) + 1
+        ).tolist()
 
     style = dict(weight=2, opacity=0.2, color="white", dashArray="3", fillOpacity=0.7)
 
@@ -171,28 +321,42 @@ def generate_style_handle(svi, geojson_data):
         position="bottomleft",
     )
 
-    # JavaScript function to handle styling based on properties
-    style_handle = assign(
-        """function(feature, context){
-        const {classes, colorscale, style, colorProp} = context.hideout;  // get props from hideout
-        const value = feature.properties[colorProp];  // get value that determines the color
-        if (value == null) {
-            style.fillColor= '#808080';  
-            return style;
-        }
-        for (let i = 0; i < classes.length; i++) {
-            if (value >= classes[i] && value < classes[i+1]) {
-                style.fillColor = colorscale[i];  // set the fill color according to the class
-                break;
-            }
-        }
-        return style;
-    }"""
-    )
+    style_handle = choropleth_style_handle
 
     return style_handle, colorscale, classes, style, colorbar
 
 
+# Only the selected SVI value and its palette index are shipped to the
+# client, one projection cached per (state, variable, class edges)
+@lru_cache(maxsize=256)
+def create_slim_geo_json_data(location_state, svi_variable, classes):
+    geo_json_data = create_geo_json_data(location_state)
+    values = svi_values(svi_variable, create_svi_columns(location_state))
+    # classes are evenly spaced, so the bin is direct arithmetic on the value
+    step = classes[1] - classes[0]
+    inv_step = 1.0 / step if step > 0 else 0.0
+    bins = np.clip(np.floor((values - classes[0]) * inv_step), 0, len(classes) - 2)
+    # the tooltip only needs 2 decimals, which keeps the JSON numbers short
+    display_values = np.round(values.astype(np.float64), 2)
+
+    features = []
+    for feature, value, b in zip(
+        geo_json_data["features"], display_values.tolist(), bins.tolist()
+    ):
+        missing = np.isnan(value)
+        features.append(
+            {
+                "type": "Feature",
+                "geometry": feature["geometry"],
+                "properties": {
+                    svi_variable: None if missing else value,
+                    "_bin": None if missing else int(b),
+                },
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
+
+
 # create tooltip
 def get_info(feature=None, svi_variable="E_TOTPOP"):
     # header = [html.B("SVI Hover Display", style={"fontSize":"14px"}), html.Br()]
@@ -201,7 +365,7 @@ def get_info(feature=None, svi_variable="E_TOTPOP"):
     return [
         html.B(svi_variable, style={"fontSize": "14px"}),
         html.Br(),
-        feature["properties"][svi_variable],
+        feature["properties"].get(svi_variable, "--"),
     ]
 
 
@@ -222,11 +386,98 @@ info = html.Div(
 )
 
 
+# Built once at import; init_map only references it
+legend = html.Div(
+    id="legend",
+    style={
+        "position": "absolute",
+        "bottom": "20px",
+        "right": "10px",
+        "zIndex": 500,
+        "backgroundColor": "rgba(255, 255, 255, 0.7)",
+        "padding": "5px",
+        "border": "1px solid #ccc",
+        "borderRadius": "5px",
+    },
+    children=[
+        html.H5("Legend", style={"marginBottom": "10px", "fontSize": "14px"}),
+        html.Div(
+            style={
+                "display": "flex",
+                "flexDirection": "column",
+                "alignItems": "flex-center",
+                "gap": "5px",
+            },
+            children=[
+                html.Div(
+                    style={
+                        "display": "flex",
+                        "alignItems": "flex-center",
+                    },
+                    children=[
+                        html.Div(
+                            style={
+                                "width": "20px",
+                                "height": "20px",
+                                "backgroundColor": "#4daf4a",
+                                "borderRadius": "50%",
+                                "marginRight": "5px",
+                            }
+                        ),
+                        html.Span("Grocery Stores"),
+                    ],
+                ),
+                html.Div(
+                    style={
+                        "display": "flex",
+                        "alignItems": "flex-center",
+                    },
+                    children=[
+                        html.Div(
+                            style={
+                                "width": "15px",
+                                "height": "15px",
+                                "backgroundColor": "#377eb8",
+                                "borderRadius": "50%",
+                                "marginRight": "8px",
+                                "marginLeft": "2px",
+                                "marginTop": "2px",
+                            }
+                        ),
+                        html.Span("Convenience Stores"),
+                    ],
+                ),
+                html.Div(
+                    style={
+                        "display": "flex",
+                        "alignItems": "flex-center",
+                    },
+                    children=[
+                        html.Div(
+                            style={
+                                "width": "10px",
+                                "height": "10px",
+                                "backgroundColor": "#e41a1c",
+                                "borderRadius": "50%",
+                                "marginRight": "11px",
+                                "marginLeft": "4px",
+                                "marginTop": "3px",
+                            }
+                        ),
+                        html.Span("Low Quality (Fast Food)"),
+                    ],
+                ),
+            ],
+        ),
+    ],
+)
+
+
 def init_map():
     return dl.Map(
         id="map",
         zoom=12,
-        center=ox.geocode(DEFAULT_PLACENAME),
+        center=cached_geocode(DEFAULT_PLACENAME),
         style={"width": "100%", "height": "600px"},
         children=[
             # Base tile layer (bottom)
@@ -300,93 +551,7 @@ def init_map():
                 name="colorbar-pane",
                 style={"zIndex": 500},
             ),
-            # Legend
-            html.Div(
-                id="legend",
-                style={
-                    "position": "absolute",
-                    "bottom": "20px",
-                    "right": "10px",
-                    "zIndex": 500,
-                    "backgroundColor": "rgba(255, 255, 255, 0.7)",
-                    "padding": "5px",
-                    "border": "1px solid #ccc",
-                    "borderRadius": "5px",
-                },
-                children=[
-                    html.H5(
-                        "Legend", style={"marginBottom": "10px", "fontSize": "14px"}
-                    ),
-                    html.Div(
-                        style={
-                            "display": "flex",
-                            "flexDirection": "column",
-                            "alignItems": "flex-center",
-                            "gap": "5px",
-                        },
-                        children=[
-                            html.Div(
-                                style={
-                                    "display": "flex",
-                                    "alignItems": "flex-center",
-                                },
-                                children=[
-                                    html.Div(
-                                        style={
-                                            "width": "20px",
-                                            "height": "20px",
-                                            "backgroundColor": "#4daf4a",
-                                            "borderRadius": "50%",
-                                            "marginRight": "5px",
-                                        }
-                                    ),
-                                    html.Span("Grocery Stores"),
-                                ],
-                            ),
-                            html.Div(
-                                style={
-                                    "display": "flex",
-                                    "alignItems": "flex-center",
-                                },
-                                children=[
-                                    html.Div(
-                                        style={
-                                            "width": "15px",
-                                            "height": "15px",
-                                            "backgroundColor": "#377eb8",
-                                            "borderRadius": "50%",
-                                            "marginRight": "8px",
-                                            "marginLeft": "2px",
-                                            "marginTop": "2px",
-                                        }
-                                    ),
-                                    html.Span("Convenience Stores"),
-                                ],
-                            ),
-                            html.Div(
-                                style={
-                                    "display": "flex",
-                                    "alignItems": "flex-center",
-                                },
-                                children=[
-                                    html.Div(
-                                        style={
-                                            "width": "10px",
-                                            "height": "10px",
-                                            "backgroundColor": "#e41a1c",
-                                            "borderRadius": "50%",
-                                            "marginRight": "11px",
-                                            "marginLeft": "4px",
-                                            "marginTop": "3px",
-                                        }
-                                    ),
-                                    html.Span("Low Quality (Fast Food)"),
-                                ],
-                            ),
-                        ],
-                    ),
-                ],
-            ),
+            legend,
         ],
     )
 
@@ -405,7 +570,7 @@ def fly_to_place(n_submit, _, placename):
         placename = DEFAULT_PLACENAME
 
     try:
-        gdf = ox.geocode_to_gdf(placename)
+        gdf = cached_geocode_to_gdf(placename)
 
     except Exception as e:
         print(f"Error geocoding {placename}: {e}")
@@ -419,7 +584,7 @@ def fly_to_place(n_submit, _, placename):
 
     bounds = gdf.total_bounds
     bounds = bounds[[1, 0, 3, 2]].reshape(2, 2).tolist()
-    geo_json_data = json.loads(gdf.geometry.boundary.to_json())
+    geo_json_data = orjson.loads(gdf.geometry.boundary.to_json())
 
     boundary_style = {
         "weight": 2,
@@ -454,9 +619,16 @@ def update_map_markers(n_submit, _, failed_search, placename):
     if failed_search:
         return dash.no_update, dash.no_update, dash.no_update
     try:
-        grocery = groceries_from_placename(placename, centroids_only=True)
-        convenience = convenience_from_placename(placename, centroids_only=True)
-        lowquality = lowquality_from_placename(placename, centroids_only=True)
+        # the three Overpass queries are independent, so run them concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            grocery, convenience, lowquality = executor.map(
+                lambda query: _poi_cached(query, placename),
+                [
+                    groceries_from_placename,
+                    convenience_from_placename,
+                    lowquality_from_placename,
+                ],
+            )
     except ox._errors.InsufficientResponseError as e:
         print(e)
         return dash.no_update, dash.no_update, dash.no_update
@@ -471,31 +643,44 @@ def update_map_markers(n_submit, _, failed_search, placename):
 @app.callback(
     Output("choropleth-layer", "children"),
     Output("colorbar-container", "children"),
+    Output("choropleth-key", "data"),
     Input("location-input", "n_submit"),
     Input("SVI-val-dropdown", "value"),
     Input("failed-search", "is_open"),
     Input("map", "viewport"),
     State("location-input", "value"),
+    State("choropleth-key", "data"),
 )
-def update_choropleth(n_submit, svi_variable, failed_search, viewport, _):
+def update_choropleth(n_submit, svi_variable, failed_search, viewport, _, last_key):
     if failed_search:
-        return dash.no_update, dash.no_update
+        return dash.no_update, dash.no_update, dash.no_update
 
     if svi_variable == "None":
-        return [], []
+        return [], [], None
 
     # SVI update is now triggered by change in viewport
     bounds = np.array(viewport["bounds"])
     center = bounds.mean(axis=0)
 
-    # Get center and state
-    location_state = find_state(center)
+    # Get center and state, falling back to this session's last rendered state
+    last_state = last_key[0] if last_key else ""
+    location_state = find_state(center, fallback=last_state)
+    if not location_state:
+        return dash.no_update, dash.no_update, dash.no_update
+
+    # Pans that stay inside the rendered state/variable change nothing
+    choropleth_key = [location_state, svi_variable]
+    if choropleth_key == last_key:
+        return dash.no_update, dash.no_update, dash.no_update
 
     # Create choropleth
-    geo_json_data = create_geo_json_data(location_state)
+    svi_columns = create_svi_columns(location_state)
 
     style_handle, colorscale, classes, style, colorbar = generate_style_handle(
-        svi_variable, geo_json_data
+        svi_variable, svi_columns
+    )
+    geo_json_data = create_slim_geo_json_data(
+        location_state, svi_variable, tuple(classes)
     )
     # mapping geojson to styler to fills in the choropleth
     choropleth = dl.GeoJSON(
@@ -505,14 +690,12 @@ def update_choropleth(n_submit, svi_variable, failed_search, viewport, _):
         hoverStyle=arrow_function({"weight": 5, "color": "#666", "dashArray": ""}),
         hideout=dict(
             colorscale=colorscale,
-            classes=classes,
             style=style,
-            colorProp=svi_variable,
         ),
         id="choropleth-layer",
     )
 
-    return choropleth, colorbar
+    return choropleth, colorbar, choropleth_key
 
 
 modal = html.Div(
@@ -709,6 +892,8 @@ app.layout = dbc.Container(
             )
         ),
         dbc.Row(dbc.Col(html.Div(id="map-container", children=[init_map(), info]))),
+        # (state, svi) currently rendered in this browser session
+        dcc.Store(id="choropleth-key"),
     ],
     fluid=True,
     
@@ -736,6 +921,7 @@ def toggle_modal(n1, is_open):
     return is_open
 
 
-# Run the app
+# Run the app (development server; production runs `gunicorn app:server`,
+# configured in gunicorn.conf.py)
 if __name__ == "__main__":
     app.run_server(debug=False)
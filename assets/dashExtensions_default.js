@@ -2,23 +2,28 @@ window.dashExtensions = Object.assign({}, window.dashExtensions, {
     default: {
         function0: function(feature, context) {
             const {
-                classes,
                 colorscale,
-                style,
-                colorProp
+                style
             } = context.hideout; // get props from hideout
-            const value = feature.properties[colorProp]; // get value that determines the color
-            if (value == null) {
+            const bin = feature.properties._bin; // palette index precomputed server side
+            if (bin == null) {
                 style.fillColor = '#808080';
                 return style;
             }
-            for (let i = 0; i < classes.length; i++) {
-                if (value >= classes[i] && value < classes[i + 1]) {
-                    style.fillColor = colorscale[i]; // set the fill color according to the class
-                    break;
-                }
-            }
+            style.fillColor = colorscale[bin];
             return style;
+        },
+        function1: function(feature, latlng, context) {
+            const {
+                color,
+                radius
+            } = context.hideout;
+            return L.circleMarker(latlng, {
+                radius: radius,
+                color: color,
+                fill: true,
+                fillOpacity: 0.5
+            });
         }
     }
 });
\ No newline at end of file
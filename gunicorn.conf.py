@@ -0,0 +1,7 @@
+# Production server settings, loaded automatically by `gunicorn app:server`.
+# Callbacks mostly wait on Nominatim/Overpass, so threaded workers let that
+# I/O overlap across users instead of queueing behind one request.
+workers = 4
+worker_class = "gthread"
+threads = 8
+timeout = 120
@@ -0,0 +1,50 @@
+"""
+One-time osmnx settings shared by the modules that query Overpass.
+Importing this module applies them; the settings are process-global.
+"""
+
+from functools import wraps
+from pathlib import Path
+
+import orjson
+import osmnx as ox
+import requests
+
+# cache raw Overpass responses, so a repeated query skips HTTP entirely
+ox.settings.use_cache = True
+ox.settings.cache_folder = str(Path("data", "processed", "overpass_cache"))
+# wait out Overpass slot limits rather than erroring on busy servers
+ox.settings.overpass_rate_limit = True
+ox.settings.requests_timeout = 180
+ox.settings.log_console = False
+
+
+def _orjson_response_json(response):
+    """
+    Response.json replacement that parses the raw bytes with orjson, skipping
+    the decoded-text copy requests makes first. Malformed bodies go through
+    the stock parser so osmnx still sees requests' own JSONDecodeError.
+    """
+
+    def json(**kwargs):
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            return requests.Response.json(response, **kwargs)
+
+    return json
+
+
+def _with_orjson(parse_response):
+    @wraps(parse_response)
+    def wrapper(response, *args, **kwargs):
+        response.json = _orjson_response_json(response)
+        return parse_response(response, *args, **kwargs)
+
+    return wrapper
+
+
+# osmnx's downloader parses HTTP responses here; if the private helper moves in
+# another osmnx release, responses are simply parsed the stock way
+if hasattr(ox._downloader, "_parse_response"):
+    ox._downloader._parse_response = _with_orjson(ox._downloader._parse_response)
@@ -1,4 +1,4 @@
-from functools import reduce, cache, wraps
+from functools import cache, wraps
 import pandas as pd
 import geopandas as gpd
 import osmnx as ox
@@ -6,17 +6,29 @@ import networkx as nx
 import os
 import sys
 from pathlib import Path
-import operator
 import numpy as np
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import hashlib
 import pickle
+import mmap
+from io import BytesIO
 import igraph as ig
+from sklearn.preprocessing import MultiLabelBinarizer
+import shapely
+from shapely.geometry.base import BaseGeometry
 from warnings import warn
 import requests
 
 GEODESIC_EPSG = 4326
 EQUAL_AREA_EPSG = 5070
+GROCERY_SNAP_DISTANCE_M = 1609.0  # one mile
+METRIC_DTYPE = np.float32  # node/edge analysis features don't need double precision
+NODE_METRICS = ["nearest_grocery_time", "pagerank", "betweenness"]
+EDGE_METRICS = ["nearest_grocery_time", "pagerank"]
+SHORTEST_PATH_BLOCK_CELLS = 50_000_000  # cap on sources x vertices per igraph call
+CBSA_DELINEATION_URL = "https://www2.census.gov/programs-surveys/metro-micro/geographies/reference-files/2023/delineation-files/list2_2023.xlsx"
 
 # operate from root directory
 if os.getcwd().endswith("notebooks") or os.getcwd().endswith("src"):
@@ -47,30 +59,157 @@ def timer(func):
     return wrapper
 
 
+def _store_cache_entry(result, entry_path):
+    """
+    Writes a cached result as one file per component: GeoDataFrames as Feather
+    (Arrow IPC) so hits load columnar data without rebuilding Python objects,
+    everything else (graphs, polygons, scalars) in a protocol 5 pickle whose
+    array buffers live in buffers.bin. meta.pickle is written last and marks
+    the entry as complete.
+    """
+    entry_path.mkdir(parents=True, exist_ok=True)
+    if isinstance(result, dict):
+        container, components = "dict", result
+    elif isinstance(result, tuple):
+        container, components = "tuple", dict(enumerate(result))
+    else:
+        container, components = "value", {"result": result}
+
+    frames = []
+    objects = {}
+    for name, value in components.items():
+        if isinstance(value, gpd.GeoDataFrame):
+            try:
+                value.to_feather(entry_path / f"{name}.feather")
+                frames.append(name)
+                continue
+            except Exception as e:
+                # e.g. list-valued OSM columns Arrow can't type; pickle instead
+                print(f"Cache feather fallback for {name}: {e}")
+        objects[name] = value
+
+    # protocol 5 hands large array buffers (graph/frame internals) out of band,
+    # so they're written straight to disk instead of copied into the pickle
+    buffers = []
+    with open(entry_path / "objects.pickle", "wb") as f:
+        pickle.dump(objects, f, protocol=5, buffer_callback=buffers.append)
+    buffer_sizes = []
+    with open(entry_path / "buffers.bin", "wb") as f:
+        for buffer in buffers:
+            raw = buffer.raw()
+            f.write(raw)
+            buffer_sizes.append(raw.nbytes)
+
+    meta = {
+        "container": container,
+        "keys": list(components.keys()),
+        "frames": frames,
+        "buffer_sizes": buffer_sizes,
+    }
+    with open(entry_path / "meta.pickle", "wb") as f:
+        pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _load_cache_entry(entry_path):
+    with open(entry_path / "meta.pickle", "rb") as f:
+        meta = pickle.load(f)
+
+    # map the raw buffers copy-on-write so unpickled arrays stay writable
+    # without reading the whole file up front
+    buffers = []
+    if meta["buffer_sizes"] and not sum(meta["buffer_sizes"]):
+        # all buffers empty: buffers.bin is zero bytes and can't be mmapped
+        buffers = [memoryview(bytearray()) for _ in meta["buffer_sizes"]]
+    elif meta["buffer_sizes"]:
+        with open(entry_path / "buffers.bin", "rb") as f:
+            mapped = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY))
+        offset = 0
+        for size in meta["buffer_sizes"]:
+            buffers.append(mapped[offset : offset + size])
+            offset += size
+    with open(entry_path / "objects.pickle", "rb") as f:
+        components = pickle.load(f, buffers=buffers)
+
+    for name in meta["frames"]:
+        components[name] = gpd.read_feather(entry_path / f"{name}.feather")
+    components = {name: components[name] for name in meta["keys"]}
+
+    if meta["container"] == "dict":
+        return components
+    if meta["container"] == "tuple":
+        return tuple(components.values())
+    return components["result"]
+
+
+def _update_cache_key(hasher, value):
+    # geometries hash by WKB: stable across processes and far cheaper than
+    # stringifying every coordinate
+    if isinstance(value, BaseGeometry):
+        hasher.update(shapely.to_wkb(value))
+    elif isinstance(value, gpd.GeoDataFrame):
+        hasher.update(b"".join(value.geometry.to_wkb()))
+    else:
+        hasher.update(repr(value).encode())
+    hasher.update(b"\x00")
+
+
+def _cache_key(func, args, kwargs):
+    hasher = hashlib.blake2b(digest_size=16)
+    _update_cache_key(hasher, func.__name__)
+    for arg in args:
+        _update_cache_key(hasher, arg)
+    for name, value in sorted(kwargs.items()):
+        _update_cache_key(hasher, name)
+        _update_cache_key(hasher, value)
+    return hasher.hexdigest()
+
+
+def rate_limiter(calls_per_second):
+    """
+    Returns a function that blocks its callers so that, across all threads,
+    at most calls_per_second calls proceed each second.
+    """
+    lock = threading.Lock()
+    interval = 1.0 / calls_per_second
+    next_slot = [0.0]
+
+    def wait():
+        with lock:
+            now = time.monotonic()
+            delay = next_slot[0] - now
+            next_slot[0] = max(now, next_slot[0]) + interval
+        if delay > 0:
+            time.sleep(delay)
+
+    return wait
+
+
+# Overpass allows ~2 requests/sec per IP, Nominatim 1 request/sec
+overpass_throttle = rate_limiter(2)
+nominatim_throttle = rate_limiter(1)
+
+
 def disk_cache(func):
     """Simple disk cache decorator with hardcoded cache directory"""
     cache_path = Path("data", "processed", "cache")  # caching path
     cache_path.mkdir(exist_ok=True)  # ok to make directory if missing
 
     @wraps(func)
-    def wrapper(*args, **kwargs):
+    def wrapper(*args, refresh_cache=False, **kwargs):
         # Create cache key from function name and arguments
-        key_parts = [func.__name__, str(args), str(sorted(kwargs.items()))]
-        key = hashlib.md5(str(key_parts).encode()).hexdigest()
-        cache_file = cache_path / f"{key}.pickle"  # lookup hash of filename
+        key = _cache_key(func, args, kwargs)
+        entry_path = cache_path / key  # lookup hash of directory name
 
-        # Check if cache exists
-        if cache_file.exists():
+        # Check if cache exists (refresh_cache=True forces a recompute)
+        if not refresh_cache and (entry_path / "meta.pickle").exists():
             try:
-                with open(cache_file, "rb") as f:
-                    return pickle.load(f)  # early return from file
+                return _load_cache_entry(entry_path)  # early return from file
             except Exception as e:
                 print(f"Cache error: {e}")
 
         # Cache miss - compute and store result
         result = func(*args, **kwargs)
-        with open(cache_file, "wb") as f:
-            pickle.dump(result, f)  # if it doesn't exist, save it with hash name
+        _store_cache_entry(result, entry_path)  # save it under the hash name
 
         return result
 
@@ -85,12 +224,9 @@ def iterable_from_keys(df, *key_fields):
     doesn't do what you need.
     """
 
-    for iter_key in (
-        df[[f for f in key_fields]].drop_duplicates().itertuples(index=False)
-    ):
-        conditions = (df[field] == getattr(iter_key, field) for field in key_fields)
-        filter = reduce(operator.and_, conditions)
-        yield df[filter]
+    # one hash partition of the frame instead of a full mask scan per key
+    for _, chunk in df.groupby(list(key_fields), sort=False, observed=True):
+        yield chunk
 
 
 @timer
@@ -101,7 +237,7 @@ def read_svi(polygon):
         "data/external/svi_tracts_gdb/SVI_2022_US/SVI2022_US_tract.gdb", bbox=bounds
     ).to_crs(epsg=GEODESIC_EPSG)
     gdf = gdf[gdf.geometry.intersects(polygon)]
-    gdf["density"] = gdf["E_TOTPOP"] / gdf["AREA_SQMI"]
+    gdf["density"] = (gdf["E_TOTPOP"] / gdf["AREA_SQMI"]).astype(np.float32)
 
     return gdf
 
@@ -109,13 +245,16 @@ def read_svi(polygon):
 @timer
 @cache
 def fetch_graph(polygon):
-    G = road_network_from_polygon(polygon)
+    overpass_throttle()
+    # the node/edge pipeline is built on consolidated intersections
+    G = road_network_from_polygon(polygon, consolidate=True)
     return G
 
 
 @timer
 @cache
 def fetch_groceries(polygon):
+    overpass_throttle()
     groceries = ox.features_from_polygon(
         polygon, tags={"shop": "supermarket"}
     ).reset_index()
@@ -126,27 +265,37 @@ def fetch_groceries(polygon):
 
 @timer
 def merge_grocery(nodes, groceries):
-    nodes = nodes.to_crs(epsg=EQUAL_AREA_EPSG)
+    # nodes arrive (and are returned) in EQUAL_AREA_EPSG
     groceries = groceries.to_crs(epsg=EQUAL_AREA_EPSG)
 
-    # Perform sjoin_nearest with projected CRS to get Euclidean distance
-    nodes["grocery"] = nodes.index.isin(
-        groceries.sjoin_nearest(
-            nodes,
-        ).index_right
+    # Perform sjoin_nearest with projected CRS to get Euclidean distance;
+    # only geometry is needed, and max_distance bounds the STRtree search
+    nearest = groceries[["geometry"]].sjoin_nearest(
+        nodes[["geometry"]],
+        max_distance=GROCERY_SNAP_DISTANCE_M,
     )
-    return nodes.to_crs(GEODESIC_EPSG)
+    nodes["grocery"] = nodes.index.isin(nearest.index_right)
+    return nodes
 
 
 @timer
 def clean_edges(edges):
-    edges = edges.copy()
-    edges = edges.dropna(axis="columns", thresh=int(len(edges) * 0.95))
-    edges = edges.dropna(axis="rows", how="any")
-    edges = edges.reset_index(drop=True)
-    # pivot out lists before generating dummies and consolidating them
-    highway_dummies = pd.get_dummies(edges.highway.explode()).groupby(level=0).sum()
-    highway_dummies.columns = [c + "_hwy" for c in highway_dummies.columns]
+    # each step returns a new frame, so the caller's edges are never mutated
+    edges = (
+        edges.dropna(axis="columns", thresh=int(len(edges) * 0.95))
+        .dropna(axis="rows", how="any")
+        .reset_index(drop=True)
+    )
+    # one sparse indicator row per edge (lists hold several highway types),
+    # instead of exploding, dummifying densely and grouping back
+    highway_lists = edges.highway.apply(lambda v: v if isinstance(v, list) else [v])
+    binarizer = MultiLabelBinarizer(sparse_output=True)
+    indicators = binarizer.fit_transform(highway_lists)
+    highway_dummies = pd.DataFrame(
+        indicators.toarray(),
+        columns=[c + "_hwy" for c in binarizer.classes_],
+        index=edges.index,
+    )
     edges = edges.join(highway_dummies)
 
     if "highway" in edges.columns:
@@ -176,55 +325,68 @@ def clean_nodes(nodes):
 
 
 @timer
-def reconcile_nodes_edges(nodes, edges):
-    complete = set(nodes.index) & set(edges.u) & set(edges.v)
+def reconcile_nodes_edges(nodes, edges, u_arr=None, v_arr=None):
+    # endpoint ids as dense int64 arrays; callers may pass them in to share
+    if u_arr is None:
+        u_arr = edges["u"].to_numpy(np.int64, copy=False)
+    if v_arr is None:
+        v_arr = edges["v"].to_numpy(np.int64, copy=False)
+
+    # hashtable intersections in pandas rather than boxed Python sets
+    complete = nodes.index.intersection(u_arr).intersection(v_arr)
+    complete_arr = complete.to_numpy(np.int64)
 
     # Filter both nodes and edges to this complete set
     nodes = nodes[nodes.index.isin(complete)]
-    edges = edges[edges.u.isin(complete) & edges.v.isin(complete)]
+    edges = edges[np.isin(u_arr, complete_arr) & np.isin(v_arr, complete_arr)]
 
     return nodes, edges
 
 
 @timer
-def merge_highway_dummies_to_nodes(nodes, edges):
-    nodes = nodes.copy()
+def merge_highway_dummies_to_nodes(nodes, edges, u_arr=None):
     highway_cols = [col for col in edges.columns if "_hwy" in col]
-    edge_data = edges[["u"] + highway_cols].copy()
-
-    # Group by node (u) and sum the highway types
-    node_highways = edge_data.groupby("u")[highway_cols].sum()
+    if u_arr is None:
+        u_arr = edges["u"].to_numpy(np.int64, copy=False)
 
-    # Join back to nodes
+    # Group by node (u) and sum the highway types; u is only a join key, so
+    # skip sorting the groups
+    node_highways = edges[highway_cols].groupby(u_arr, sort=False).sum()
 
+    # Join back to nodes (join returns a new frame)
     nodes = nodes.join(node_highways)
     return nodes
 
 
 @timer
 def merge_svi(nodes, svi, svi_fields=["density"]):
+    # nodes arrive (and are returned) in EQUAL_AREA_EPSG
     fields = svi_fields.copy()
     if "geometry" not in fields:
         fields.append("geometry")
-    nodes = nodes.to_crs(epsg=EQUAL_AREA_EPSG)
-    svi = svi.to_crs(epsg=EQUAL_AREA_EPSG)
-    svi = svi[fields]
+    # subset before reprojecting so only the joined fields are transformed
+    svi = svi[fields].to_crs(epsg=EQUAL_AREA_EPSG)
     try:
-        nodes = nodes.sjoin(svi, how="left", predicate="within").to_crs(
-            epsg=GEODESIC_EPSG
-        )
+        nodes = nodes.sjoin(svi, how="left", predicate="within")
     except Exception as e:
         warn(f"Falling back to spatial join using GEODESIC geometry. {e}")
         nodes = nodes.to_crs(epsg=GEODESIC_EPSG)
         svi = svi.to_crs(epsg=GEODESIC_EPSG)
-        nodes.sjoin(svi, how="left", predicate="within")
-    return nodes
+        nodes = nodes.sjoin(svi, how="left", predicate="within").to_crs(
+            epsg=EQUAL_AREA_EPSG
+        )
+    return nodes.drop(columns="index_right")
 
 
 @timer
-def add_grocery_travel_time(graph, igraph=True):
+def add_grocery_travel_time(graph, igraph=True, ig_graph=None):
     if igraph:
-        return add_grocery_travel_time_igraph(graph)
+        return add_grocery_travel_time_igraph(graph, ig_graph)
+    warn(
+        "The networkx grocery travel time path is deprecated; use igraph=True.",
+        DeprecationWarning,
+        stacklevel=2,
+    )
     grocery_node_ids = [
         node for node, attr in graph.nodes(data=True) if attr.get("grocery", False)
     ]
@@ -257,17 +419,19 @@ def add_grocery_travel_time(graph, igraph=True):
 
 
 @timer
-def add_grocery_travel_time_igraph(graph):
-    # Convert to igraph
-    ig_graph = ig.Graph.from_networkx(graph)
+def add_grocery_travel_time_igraph(graph, ig_graph=None):
+    # Convert to igraph unless the caller already has a conversion
+    if ig_graph is None:
+        ig_graph = _to_igraph(graph)
 
     # For street networks, we want paths TO grocery stores
     # Since we're calculating from grocery stores, use 'in' to respect one-way streets
     mode = "in" if ig_graph.is_directed() else "all"
 
     # Get the vertex indices of grocery stores
-    node_to_idx = {name: idx for idx, name in enumerate(ig_graph.vs["_nx_name"])}
-    idx_to_node = {idx: name for name, idx in node_to_idx.items()}
+    # vertex names in index order; the list itself maps index -> node
+    names = ig_graph.vs["_nx_name"]
+    node_to_idx = {name: idx for idx, name in enumerate(names)}
     grocery_indices = [
         node_to_idx[node]
         for node, attr in graph.nodes(data=True)
@@ -278,54 +442,82 @@ def add_grocery_travel_time_igraph(graph):
         warn("No grocery stores found in graph!")
         return graph
 
-    # Calculate shortest paths TO grocery stores by calculating backwards
-    shortest_paths = ig_graph.shortest_paths(
-        source=grocery_indices, weights="travel_time", mode=mode
+    # Calculate shortest paths TO grocery stores by calculating backwards, in
+    # blocks of sources so the G x N distance matrix is never held at once;
+    # keep a running per-node minimum and the grocery-to-grocery rows
+    n_groceries = len(grocery_indices)
+    block_size = max(1, SHORTEST_PATH_BLOCK_CELLS // max(1, ig_graph.vcount()))
+    nearest_grocery = np.full(ig_graph.vcount(), np.inf)
+    between_groceries = np.empty((n_groceries, n_groceries), dtype=np.float64)
+    for start in range(0, n_groceries, block_size):
+        sources = grocery_indices[start : start + block_size]
+        block = np.asarray(
+            ig_graph.shortest_paths(source=sources, weights="travel_time", mode=mode),
+            dtype=np.float64,
+        )
+        # For each node (column), minimum distance to any grocery store (rows)
+        np.minimum(nearest_grocery, block.min(axis=0), out=nearest_grocery)
+        between_groceries[start : start + len(sources)] = block[:, grocery_indices]
+    # reduce in float64, store as METRIC_DTYPE
+    shortest_paths_to_grocery = dict(
+        zip(names, nearest_grocery.astype(METRIC_DTYPE).tolist())
     )
 
-    # For each node (column), get minimum distance to any grocery store (rows)
-    shortest_paths_to_grocery = {
-        idx_to_node[j]: min(shortest_paths[i][j] for i in range(len(grocery_indices)))
-        for j in range(len(ig_graph.vs))
-    }
-
-    # For grocery stores themselves, find distance to nearest OTHER grocery store
-    for grocery_idx in grocery_indices:
-        node_name = idx_to_node[grocery_idx]
-        # Filter distances to all OTHER grocery stores
-        other_store_distances = [
-            shortest_paths[i][grocery_idx]
-            for i in range(len(grocery_indices))
-            if grocery_indices[i] != grocery_idx
-        ]
-        if other_store_distances:
-            shortest_paths_to_grocery[node_name] = min(other_store_distances)
+    # For grocery stores themselves, find distance to nearest OTHER grocery store:
+    # the grocery-to-grocery block with its diagonal (self distance) masked out
+    if n_groceries > 1:
+        np.fill_diagonal(between_groceries, np.inf)
+        nearest_other = between_groceries.min(axis=0).astype(METRIC_DTYPE)
+        for grocery_idx, distance in zip(grocery_indices, nearest_other.tolist()):
+            shortest_paths_to_grocery[names[grocery_idx]] = distance
 
     nx.set_node_attributes(graph, shortest_paths_to_grocery, "nearest_grocery_time")
     return graph
 
 
+def _to_igraph(graph):
+    """Converts a networkx graph to igraph; node names are kept in vs["_nx_name"]."""
+    return ig.Graph.from_networkx(graph)
+
+
 @timer
-def add_pagerank(graph):
-    nx.set_node_attributes(graph, nx.pagerank(graph), "pagerank")
+def add_pagerank(graph, ig_graph=None):
+    # unweighted like nx.pagerank on these graphs (no "weight" attribute);
+    # parallel edges count once each, matching networkx's multigraph handling
+    if ig_graph is None:
+        ig_graph = _to_igraph(graph)
+    pagerank = np.asarray(
+        ig_graph.pagerank(directed=ig_graph.is_directed()), dtype=METRIC_DTYPE
+    )
+    nx.set_node_attributes(
+        graph, dict(zip(ig_graph.vs["_nx_name"], pagerank.tolist())), "pagerank"
+    )
     return graph
 
 
 @timer
-def add_betweenness(graph, k=500):
-    # print("start conversion to ig_graph")
-    ig_graph = ig.Graph.from_networkx(graph)
-    # print("converted to ig_graph")
-    btw = ig_graph.betweenness(weights="travel_time", cutoff=k)
+def add_betweenness(graph, k=500, ig_graph=None):
+    if ig_graph is None:
+        ig_graph = _to_igraph(graph)
+    btw = np.asarray(
+        ig_graph.betweenness(weights="travel_time", cutoff=k), dtype=METRIC_DTYPE
+    )
 
-    nx.set_node_attributes(graph, dict(zip(graph.nodes(), btw)), "betweenness")
+    nx.set_node_attributes(
+        graph, dict(zip(ig_graph.vs["_nx_name"], btw.tolist())), "betweenness"
+    )
     return graph
 
 
 @timer
+@disk_cache
 def generate_placenames():
+    # download once; the parsed list is served from the disk cache afterwards
+    response = requests.get(CBSA_DELINEATION_URL, timeout=60)
+    response.raise_for_status()
     cities = pd.read_excel(
-        "https://www2.census.gov/programs-surveys/metro-micro/geographies/reference-files/2023/delineation-files/list2_2023.xlsx",
+        BytesIO(response.content),
+        engine="openpyxl",
         skiprows=2,
     )
     cities = cities[~cities["CBSA Title"].isna()]
@@ -339,72 +531,83 @@ def generate_placenames():
     return placenames
 
 
-@timer
-def batch_process_cities(placenames):
-    places = {}
-    N = len(placenames)
-    failed_cities = []  # Track failures
-    successful_cities = []  # Track successes
+def process_city(placename, retries=3, retry_delay=60):
+    """
+    Runs data_from_placename for one city with retries on connection timeouts.
+    Returns the result dictionary, or None if the city could not be processed.
+    """
+    for attempt in range(retries):
+        try:
+            result = data_from_placename(
+                placename,
+                radius_m=10000,
+                buffer=5000,
+                refresh_cache=False,
+                return_dictionary=True,
+            )
 
-    for i, placename in enumerate(placenames):
-        print(f"Processing: {i}/{N} - {placename}")
-        retries = 3
-        retry_delay = 60
+            # Verify the result before adding
+            if result and isinstance(result, dict) and "nodes" in result:
+                print(f"Successfully processed {placename}")
+                return result
+            else:
+                raise ValueError(f"Invalid result format for {placename}")
 
-        success = False
-        for attempt in range(retries):
-            try:
-                result = data_from_placename(
-                    placename,
-                    radius_m=10000,
-                    buffer=5000,
-                    refresh_cache=False,
-                    return_dictionary=True,
+        except requests.exceptions.ConnectTimeout:
+            if attempt < retries - 1:
+                wait_time = retry_delay * (attempt + 1)
+                warn(
+                    f"Timeout for {placename}, waiting {wait_time}s before retry {attempt + 1}"
                 )
-
-                # Verify the result before adding
-                if result and isinstance(result, dict) and "nodes" in result:
-                    places[placename] = result
-                    successful_cities.append(placename)
-                    print(f"Successfully processed {placename}")
-                    success = True
-                    break
-                else:
-                    raise ValueError(f"Invalid result format for {placename}")
-
-            except requests.exceptions.ConnectTimeout:
-                if attempt < retries - 1:
-                    wait_time = retry_delay * (attempt + 1)
-                    warn(
-                        f"Timeout for {placename}, waiting {wait_time}s before retry {attempt + 1}"
-                    )
-                    time.sleep(wait_time)
-                else:
-                    warn(
-                        f"Failed to process {placename} after {retries} attempts - Timeout"
-                    )
-
-            except ox._errors.InsufficientResponseError as e:
-                warn(f"Unable to complete data pull for {placename}: {str(e)}")
-                break  # Don't retry
-
-            except Exception as e:
+                time.sleep(wait_time)
+            else:
                 warn(
-                    f"Failed to process {placename} after {retries} attempts - {str(e)}"
+                    f"Failed to process {placename} after {retries} attempts - Timeout"
                 )
 
-        if not success:
-            failed_cities.append(placename)
+        except ox._errors.InsufficientResponseError as e:
+            warn(f"Unable to complete data pull for {placename}: {str(e)}")
+            break  # Don't retry
+
+        except Exception as e:
+            warn(f"Failed to process {placename} after {retries} attempts - {str(e)}")
 
-        # Periodic status update
-        if (i + 1) % 5 == 0 or i == N - 1:
-            print( "\nProgress Update:")
-            print(f"Processed: {i + 1}/{N}")
-            print(f"Successful: {len(successful_cities)}")
-            print(f"Failed: {len(failed_cities)}")
-            if failed_cities:
-                print(f"Failed cities: {failed_cities}")
-            print("\n")
+    return None
+
+
+@timer
+def batch_process_cities(placenames, max_workers=4):
+    places = {}
+    N = len(placenames)
+    failed_cities = []  # Track failures
+    successful_cities = []  # Track successes
+
+    # cities are network bound, so threads overlap the API waits; the shared
+    # throttles keep Overpass/Nominatim within their request rate policies
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for i, placename in enumerate(placenames):
+            print(f"Processing: {i}/{N} - {placename}")
+            futures[executor.submit(process_city, placename)] = placename
+
+        for i, future in enumerate(as_completed(futures)):
+            placename = futures[future]
+            result = future.result()
+            if result is not None:
+                places[placename] = result
+                successful_cities.append(placename)
+            else:
+                failed_cities.append(placename)
+
+            # Periodic status update
+            if (i + 1) % 5 == 0 or i == N - 1:
+                print( "\nProgress Update:")
+                print(f"Processed: {i + 1}/{N}")
+                print(f"Successful: {len(successful_cities)}")
+                print(f"Failed: {len(failed_cities)}")
+                if failed_cities:
+                    print(f"Failed cities: {failed_cities}")
+                print("\n")
 
     # Final summary
     print("\nProcessing Complete!")
@@ -421,13 +624,28 @@ def batch_process_cities(placenames):
 
 @timer
 def add_average_to_edge(graph, attribute):
-    for u, v, k in graph.edges(keys=True):
+    if graph.number_of_edges() == 0:
+        return graph
 
-        source_value = graph.nodes[u].get(attribute, np.nan)
-        target_value = graph.nodes[v].get(attribute, np.nan)
-        average_value = (source_value + target_value) / 2
-        graph.edges[u, v, k][attribute] = average_value
+    # gather node values into an array, then average by endpoint index
+    node_to_idx = {}
+    node_values = np.empty(graph.number_of_nodes(), dtype=METRIC_DTYPE)
+    for idx, (node, value) in enumerate(graph.nodes(data=attribute, default=np.nan)):
+        node_to_idx[node] = idx
+        node_values[idx] = value
 
+    edge_keys = list(graph.edges(keys=True))
+    u_idx = np.fromiter(
+        (node_to_idx[u] for u, _, _ in edge_keys), dtype=np.intp, count=len(edge_keys)
+    )
+    v_idx = np.fromiter(
+        (node_to_idx[v] for _, v, _ in edge_keys), dtype=np.intp, count=len(edge_keys)
+    )
+    average_values = (node_values[u_idx] + node_values[v_idx]) * 0.5
+
+    nx.set_edge_attributes(
+        graph, dict(zip(edge_keys, average_values.tolist())), attribute
+    )
     return graph
 
 
@@ -438,6 +656,7 @@ def data_from_placename(
 ):
 
     results = {}
+    nominatim_throttle()
     center = ox.geocode(placename)
 
     area_of_analysis = create_circular_polygon(
@@ -471,8 +690,11 @@ def data_from_placename(
         not edges.index.duplicated().any()
     ), "Duplicate indices found in the edges dataframe"
 
-    # joining sources to nodes
+    # joining sources to nodes on one equal-area copy, projected back once
+    nodes = nodes.to_crs(epsg=EQUAL_AREA_EPSG)
     nodes = merge_grocery(nodes, groceries)
+    nodes = merge_svi(nodes, svi)
+    nodes = nodes.to_crs(epsg=GEODESIC_EPSG)
     assert "index_right" not in nodes.columns
     # return nodes
     assert (
@@ -481,19 +703,29 @@ def data_from_placename(
 
     # rebuild graph
     street_nx = ox.convert.graph_from_gdfs(nodes, edges)
+    # one igraph conversion shared by the metrics below; they only add node
+    # attributes to street_nx, so the structure and weights stay in sync
+    street_ig = _to_igraph(street_nx)
 
     # Shortest grocery travel_times
-    street_nx = add_grocery_travel_time(street_nx)
+    street_nx = add_grocery_travel_time(street_nx, ig_graph=street_ig)
 
     # Adding pagerank
-    street_nx = add_pagerank(street_nx)
-    street_nx = add_betweenness(street_nx)
+    street_nx = add_pagerank(street_nx, ig_graph=street_ig)
+    street_nx = add_betweenness(street_nx, ig_graph=street_ig)
     assert "index_right" not in nodes.columns
     # blending node values for edges
     street_nx = add_average_to_edge(street_nx, "nearest_grocery_time")
     street_nx = add_average_to_edge(street_nx, "pagerank")
 
     nodes, edges = ox.graph_to_gdfs(street_nx)
+    # attribute dicts hold Python floats; store the metric columns narrow
+    nodes = nodes.astype(
+        {col: METRIC_DTYPE for col in NODE_METRICS if col in nodes.columns}
+    )
+    edges = edges.astype(
+        {col: METRIC_DTYPE for col in EDGE_METRICS if col in edges.columns}
+    )
     assert "index_right" not in nodes.columns
     # provide filters to get different levels of analysis
     nodes = nodes.assign(aoa=nodes.geometry.within(area_of_analysis))
@@ -518,8 +750,6 @@ def data_from_placename(
     assert "geometry" in edges.columns
     assert "index_right" not in nodes.columns
 
-    nodes = merge_svi(nodes, svi)
-
     assert (
         not nodes.index.duplicated().any()
     ), "Duplicate indices found in the nodes dataframe"
@@ -541,12 +771,16 @@ def data_from_placename(
     assert isinstance(edges, (gpd.GeoDataFrame))
     assert "geometry" in nodes.columns
     assert "geometry" in edges.columns
-    nodes, edges = reconcile_nodes_edges(nodes, edges)
+    # endpoint ids pulled out once as int64 arrays for the joins below
+    u_arr = edges["u"].to_numpy(np.int64, copy=False)
+    v_arr = edges["v"].to_numpy(np.int64, copy=False)
+    nodes, edges = reconcile_nodes_edges(nodes, edges, u_arr, v_arr)
     assert isinstance(nodes, (gpd.GeoDataFrame))
     assert isinstance(edges, (gpd.GeoDataFrame))
     # print(f"pre_dummymerge edge columns:{edges.columns}")
     # print(f"pre_dummymerge node columns:{nodes.columns}")
-    nodes = merge_highway_dummies_to_nodes(nodes, edges)
+    u_arr = edges["u"].to_numpy(np.int64, copy=False)  # reconciled rows
+    nodes = merge_highway_dummies_to_nodes(nodes, edges, u_arr)
     assert "x" in nodes.columns
     assert "y" in nodes.columns
     # print(f"post_dummymerge edge columns:{edges.columns}")
@@ -0,0 +1,33 @@
+import geopandas as gpd
+from pathlib import Path
+import os
+import sys
+
+# operate from root directory
+if os.getcwd().endswith("notebooks") or os.getcwd().endswith("src"):
+    os.chdir("..")
+
+
+def state_geojson_to_parquet(data_dir="data"):
+    """
+    Writes a GeoParquet copy next to every state GeoJSON file so the app can
+    skip parsing the text GeoJSON on a cold cache.
+
+    Args:
+        data_dir (str, optional): Directory holding the geo_json_<state>.json
+            files. Defaults to "data".
+
+    Returns:
+        list[Path]: Paths of the parquet files written.
+    """
+    written = []
+    for json_path in sorted(Path(data_dir).glob("geo_json_*.json")):
+        parquet_path = json_path.with_suffix(".parquet")
+        gpd.read_file(json_path).to_parquet(parquet_path)
+        written.append(parquet_path)
+    return written
+
+
+if __name__ == "__main__":
+    for path in state_geojson_to_parquet(*sys.argv[1:]):
+        print(f"Wrote {path}")
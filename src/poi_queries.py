@@ -1,6 +1,7 @@
 import osmnx as ox
+import pandas as pd
 import geopandas as gpd
-from functools import cache
+from functools import lru_cache
 from shapely.geometry import Point
 from geopandas import GeoDataFrame
 from shapely.geometry.base import BaseGeometry
@@ -18,6 +19,16 @@ TERTIARY = [
     {"amenity": "fuel"},
 ]
 
+# POI categories served by pois_from_placename: (tags, label)
+CATEGORIES = {
+    "grocery": (PRIMARY, "Grocery"),
+    "convenience": (SECONDARY, "Convenience"),
+    "lowquality": (TERTIARY, "Low Quality"),
+}
+
+# bound on memoized POI query results per process (each holds a GeoDataFrame)
+POI_CACHE_SIZE = 32
+
 GEODESIC_EPSG = 4326
 CARTESIAN_EPSG = 32633
 if os.getcwd().endswith("notebooks") or os.getcwd().endswith("src"):
@@ -27,19 +38,20 @@ if "src" not in sys.path:
     sys.path.append("src")
 
 
-def _make_hashable_tags_helper(tags: dict | list[dict]) -> frozenset:
+def _make_hashable_tags_helper(tags: dict | list[dict]) -> tuple:
     """
-    Convert a dictionary or list of dictionaries of tags into a hashable type (frozenset of tuples).
+    Convert a dictionary or list of dictionaries of tags into a hashable type (sorted tuple of
+    key/value pairs, with list values as tuples). Sorting keeps equal tags on the same cache key.
     This allows the cache function to work properly.
 
     Args:
         tags (dict | list[dict]): Tags to be converted.
 
     Returns:
-        frozenset: Hashable representation of the tags.
+        tuple: Hashable representation of the tags.
     """
     if isinstance(tags, dict):
-        return frozenset(tags.items())
+        combined_tags = tags
     elif isinstance(tags, list):
         combined_tags = {}
         for tag in tags:
@@ -51,58 +63,78 @@ def _make_hashable_tags_helper(tags: dict | list[dict]) -> frozenset:
                         combined_tags[key] = [combined_tags[key], value]
                 else:
                     combined_tags[key] = value
-        return frozenset(
+    else:
+        raise ValueError("Tags must be a dictionary or a list of dictionaries.")
+    return tuple(
+        sorted(
             (key, tuple(value) if isinstance(value, list) else value)
             for key, value in combined_tags.items()
         )
-    else:
-        raise ValueError("Tags must be a dictionary or a list of dictionaries.")
+    )
+
+
+def _tags_from_hashable(hashable_tags: tuple) -> dict:
+    """Rebuild the osmnx tags dict from _make_hashable_tags_helper output in one pass."""
+    return {
+        key: list(value) if isinstance(value, tuple) else value
+        for key, value in hashable_tags
+    }
 
 
-# @cache
-def _from_place_name_helper(placename: str, hashable_tags: frozenset) -> GeoDataFrame:
+@lru_cache(maxsize=POI_CACHE_SIZE)
+def _from_place_name_helper(placename: str, hashable_tags: tuple) -> GeoDataFrame:
     """
     Cached function to store POI results based on place name and hashable tags.
+    The returned GeoDataFrame is shared between calls; copy it before mutating.
 
     Args:
         placename (str): Name of the place.
-        hashable_tags (frozenset): Hashable representation of tags.
+        hashable_tags (tuple): Hashable representation of tags.
 
     Returns:
         GeoDataFrame: GeoDataFrame containing the POI results.
     """
-    tags = {key: value for key, value in hashable_tags}
-    tags = {
-        key: list(value) if isinstance(value, tuple) else value
-        for key, value in tags.items()
-    }
-    
-    return ox.features_from_place(placename, tags=tags)
+    return ox.features_from_place(placename, tags=_tags_from_hashable(hashable_tags))
 
 
-# @cache
+@lru_cache(maxsize=POI_CACHE_SIZE)
 def _from_point_helper(
-    lat: float, lon: float, radius_m: int, hashable_tags: frozenset
+    lat: float, lon: float, radius_m: int, hashable_tags: tuple
 ) -> GeoDataFrame:
     """
     Cached function to retrieve OSM features within a circular area based on tags.
+    The returned GeoDataFrame is shared between calls; copy it before mutating.
 
     Args:
         lat (float): Latitude of the center point.
         lon (float): Longitude of the center point.
         radius_m (int): Radius in meters.
-        hashable_tags (frozenset): Hashable representation of tags.
+        hashable_tags (tuple): Hashable representation of tags.
 
     Returns:
         GeoDataFrame: GeoDataFrame containing the OSM features.
     """
     polygon = create_circular_polygon(lat=lat, lon=lon, radius_m=radius_m)
-    tags = {key: value for key, value in hashable_tags}
-    tags = {
-        key: list(value) if isinstance(value, tuple) else value
-        for key, value in tags.items()
-    }
-    return ox.features_from_polygon(polygon, tags=tags)
+    return ox.features_from_polygon(polygon, tags=_tags_from_hashable(hashable_tags))
+
+
+def _tag_mask(gdf: GeoDataFrame, tags: dict | list[dict]) -> pd.Series:
+    """
+    Boolean mask of the features in gdf matching any of the given tags.
+
+    Args:
+        gdf (GeoDataFrame): OSM features with one column per tag key.
+        tags (dict | list[dict]): Tags to match, in the same form as the query tags.
+
+    Returns:
+        pd.Series: True where a feature matches at least one tag.
+    """
+    mask = pd.Series(False, index=gdf.index)
+    for tag in [tags] if isinstance(tags, dict) else tags:
+        for key, value in tag.items():
+            if key in gdf.columns:
+                mask |= gdf[key].isin(value if isinstance(value, list) else [value])
+    return mask
 
 
 def get_centroids(gdf_polygons: GeoDataFrame) -> GeoDataFrame:
@@ -189,7 +221,9 @@ def groceries_from_placename(
     Returns:
         GeoDataFrame: GeoDataFrame containing the grocery POIs.
     """
-    gdf = _from_place_name_helper(placename, _make_hashable_tags_helper(PRIMARY))
+    gdf = _from_place_name_helper(
+        placename, _make_hashable_tags_helper(PRIMARY)
+    ).copy()
     if centroids_only:
         gdf["geometry"] = get_centroids(gdf)
     gdf["label"] = "Grocery"
@@ -209,7 +243,9 @@ def convenience_from_placename(
     Returns:
         GeoDataFrame: GeoDataFrame containing the convenience store POIs.
     """
-    gdf = _from_place_name_helper(placename, _make_hashable_tags_helper(SECONDARY))
+    gdf = _from_place_name_helper(
+        placename, _make_hashable_tags_helper(SECONDARY)
+    ).copy()
     if centroids_only:
         gdf["geometry"] = get_centroids(gdf)
     gdf["label"] = "Convenience"
@@ -229,13 +265,51 @@ def lowquality_from_placename(
     Returns:
         GeoDataFrame: GeoDataFrame containing the low-quality food POIs.
     """
-    gdf = _from_place_name_helper(placename, _make_hashable_tags_helper(TERTIARY))
+    gdf = _from_place_name_helper(
+        placename, _make_hashable_tags_helper(TERTIARY)
+    ).copy()
     if centroids_only:
         gdf["geometry"] = get_centroids(gdf)
     gdf["label"] = "Low Quality"
     return gdf
 
 
+def pois_from_placename(
+    placename: str,
+    categories: tuple[str, ...] = ("grocery", "convenience", "lowquality"),
+    centroids_only: bool = True,
+) -> dict[str, GeoDataFrame]:
+    """
+    Retrieve POIs for several categories from a place name with a single Overpass query.
+    The combined result is split client-side by tag; a feature matching more than one
+    category appears in each, as it would with separate queries.
+
+    Args:
+        placename (str): Name of the place.
+        categories (tuple[str, ...], optional): Keys of CATEGORIES to retrieve. Defaults to all.
+        centroids_only (bool, optional): Whether to return centroids only. Defaults to True.
+
+    Returns:
+        dict[str, GeoDataFrame]: GeoDataFrame of POIs for each requested category.
+    """
+    tags = []
+    for category in categories:
+        category_tags = CATEGORIES[category][0]
+        if isinstance(category_tags, dict):
+            category_tags = [category_tags]
+        tags.extend(category_tags)
+
+    gdf = _from_place_name_helper(placename, _make_hashable_tags_helper(tags)).copy()
+    if centroids_only:
+        gdf["geometry"] = get_centroids(gdf)
+
+    pois = {}
+    for category in categories:
+        category_tags, label = CATEGORIES[category]
+        pois[category] = gdf[_tag_mask(gdf, category_tags)].assign(label=label)
+    return pois
+
+
 def groceries_from_point(
     lat: float, lon: float, radius_m: int = 10_000, centroids_only: bool = True
 ) -> GeoDataFrame:
@@ -252,7 +326,9 @@ def groceries_from_point(
         GeoDataFrame: GeoDataFrame containing the grocery POIs.
     """
 
-    gdf = _from_point_helper(lat, lon, radius_m, _make_hashable_tags_helper(PRIMARY))
+    gdf = _from_point_helper(
+        lat, lon, radius_m, _make_hashable_tags_helper(PRIMARY)
+    ).copy()
     if centroids_only:
         gdf["geometry"] = get_centroids(gdf)
     gdf["label"] = "Grocery"
@@ -275,7 +351,9 @@ def convenience_from_point(
         GeoDataFrame: GeoDataFrame containing the convenience store POIs.
     """
 
-    gdf = _from_point_helper(lat, lon, radius_m, _make_hashable_tags_helper(SECONDARY))
+    gdf = _from_point_helper(
+        lat, lon, radius_m, _make_hashable_tags_helper(SECONDARY)
+    ).copy()
     if centroids_only:
         gdf["geometry"] = get_centroids(gdf)
     gdf["label"] = "Convenience"
@@ -298,7 +376,9 @@ def lowquality_from_point(
         GeoDataFrame: GeoDataFrame containing the low-quality food POIs.
     """
 
-    gdf = _from_point_helper(lat, lon, radius_m, _make_hashable_tags_helper(TERTIARY))
+    gdf = _from_point_helper(
+        lat, lon, radius_m, _make_hashable_tags_helper(TERTIARY)
+    ).copy()
     if centroids_only:
         gdf["geometry"] = get_centroids(gdf)
     gdf["label"] = "Low Quality"
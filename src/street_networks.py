@@ -5,19 +5,44 @@ from networkx.exception import NetworkXPointlessConcept
 from shapely import centroid
 import os
 import sys
+import hashlib
+import pickle
+import shelve
+from operator import itemgetter
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+import shapely
 from shapely import Point
+from shapely.geometry.base import BaseGeometry
 import geopandas as gpd
 import warnings 
 
 GEODESIC_EPSG = 4326
 EQUAL_AREA_EPSG = 5070
 
+# filters the highway field using regex (removes service roads)
+DRIVE_FILTER = '["highway"~"motorway|trunk|primary|secondary|tertiary|residential"]'
+GRAPH_STORE_PATH = Path("data", "processed", "graph_store")
+# bump when the graph pipeline changes so stored graphs are rebuilt
+GRAPH_PIPELINE_VERSION = 2
+OVERPASS_MAX_CONCURRENT = 4
+# osmnx's default max_query_area_size (50 km x 50 km); larger polygons get split
+MAX_QUERY_AREA_KM2 = 2_500
+
+# shared across calls so concurrent city pulls stay under the Overpass ceiling
+_overpass_slots = threading.Semaphore(OVERPASS_MAX_CONCURRENT)
+# shelve/dbm files are not safe for concurrent access from threads
+_graph_store_lock = threading.Lock()
+
 if os.getcwd().endswith("notebooks") or os.getcwd().endswith("src"):
     os.chdir("..")
 
 if "src" not in sys.path:
     sys.path.append("src")
 from poi_queries import create_circular_polygon
+import _osmnx_config  # noqa: F401  (imported for its side effect: applies osmnx settings)
 
 
 def key_to_max(dictionary: dict) -> any:
@@ -36,7 +61,7 @@ def key_to_max(dictionary: dict) -> any:
     """
     if not dictionary:
         raise ValueError("The dictionary is empty. Cannot determine maximum key.")
-    return max(dictionary, key=lambda idx: dictionary[idx])
+    return max(dictionary.items(), key=itemgetter(1))[0]
 
 
 # def busiest_intersection(polygon, precomputed_graph=None):
@@ -64,8 +89,9 @@ def key_to_max(dictionary: dict) -> any:
 
 #     if G is not None:
 
-#         weights = dict(G.degree())
-#         busiest = G.nodes[key_to_max(weights)]
+#         # argmax straight off the DegreeView, no intermediate degree dict
+#         busiest_node, _ = max(G.degree(), key=itemgetter(1))
+#         busiest = G.nodes[busiest_node]
 
 #         return ox.utils_geo.Point((busiest["y"], busiest["x"]))
 
@@ -89,55 +115,220 @@ def fallback_point(polygon):
     return point
 
 
-def road_network_from_polygon(polygon) -> nx.MultiDiGraph:
+def _graph_cache_key(polygon_wkb: bytes, custom_filter: str, *options) -> str:
+    """Stable key for a road network query: the polygon's WKB, the Overpass filter
+    and any pipeline options that change the finished graph."""
+    suffix = "|".join([custom_filter, *map(repr, options)])
+    return hashlib.blake2b(polygon_wkb + suffix.encode()).hexdigest()
+
+
+def _graph_from_subpolygon(polygon, custom_filter: str) -> nx.MultiDiGraph:
+    """Unsimplified drive graph for one piece of a subdivided query polygon."""
+    with _overpass_slots:
+        try:
+            # truncate_by_edge keeps edges crossing into the neighbouring pieces
+            return ox.graph_from_polygon(
+                polygon,
+                network_type="drive",
+                simplify=False,
+                retain_all=True,
+                truncate_by_edge=True,
+                custom_filter=custom_filter,
+            )
+        except (NetworkXPointlessConcept, ox._errors.InsufficientResponseError):
+            # an empty piece (open water, desert) shouldn't sink the whole query
+            return None
+
+
+def _subdivide_polygon(polygon) -> list:
+    """
+    Splits a lat/lon polygon into pieces no larger than osmnx's
+    max_query_area_size. That limit is in projected m², so the polygon is
+    projected to UTM first (as osmnx does) and each piece is projected back.
+    """
+    polygon_proj, crs_proj = ox.projection.project_geometry(polygon)
+    subdivided = ox.utils_geo._consolidate_subdivide_geometry(polygon_proj)
+    return [
+        ox.projection.project_geometry(piece, crs=crs_proj, to_latlong=True)[0]
+        for piece in getattr(subdivided, "geoms", [subdivided])
+    ]
+
+
+def _download_road_graph(polygon, custom_filter: str) -> nx.MultiDiGraph:
+    """
+    Queries the drive network for polygon. Polygons larger than
+    MAX_QUERY_AREA_KM2 are split the way osmnx splits them, the pieces are
+    fetched concurrently, and the composed graph is simplified once.
+    """
+    # check the size up front so only large queries pay for subdividing
+    area_km2 = (
+        gpd.GeoSeries([polygon], crs=GEODESIC_EPSG).to_crs(EQUAL_AREA_EPSG).area.iloc[0]
+        / 1e6
+    )
+    if area_km2 > MAX_QUERY_AREA_KM2:
+        pieces = _subdivide_polygon(polygon)
+        warnings.warn(
+            f"Query polygon covers {area_km2:,.0f} km2; splitting it into "
+            f"{len(pieces)} Overpass queries, run {OVERPASS_MAX_CONCURRENT} at a "
+            "time, which may take several minutes"
+        )
+    else:
+        pieces = [polygon]
+
+    if len(pieces) == 1:
+        with _overpass_slots:
+            return ox.graph_from_polygon(
+                polygon,
+                network_type="drive",
+                simplify=True,
+                retain_all=False,
+                custom_filter=custom_filter,
+            )
+
+    with ThreadPoolExecutor(max_workers=OVERPASS_MAX_CONCURRENT) as executor:
+        graphs = [
+            G
+            for G in executor.map(
+                lambda piece: _graph_from_subpolygon(piece, custom_filter), pieces
+            )
+            if G is not None
+        ]
+    if not graphs:
+        raise NetworkXPointlessConcept("No streets in any subdivided query polygon")
+
+    G = nx.compose_all(graphs)
+    # pieces tile the polygon's convex hull; cut back to the polygon itself
+    G = ox.truncate.truncate_graph_polygon(G, polygon, truncate_by_edge=False)
+    G = ox.simplify_graph(G)
+    return ox.truncate.largest_component(G, strongly=False)
+
+
+@lru_cache(maxsize=16)
+def _cached_road_network(
+    key: str,
+    polygon_wkb: bytes,
+    custom_filter: str,
+    consolidate: bool = False,
+    tolerance_m: float = 10,
+) -> nx.MultiDiGraph:
+    """
+    Loads the finished road network for key from the shelve at GRAPH_STORE_PATH,
+    or builds and stores it. Memoized in-process by key, so the returned graph
+    is shared between callers.
+    """
+    GRAPH_STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with _graph_store_lock, shelve.open(
+        str(GRAPH_STORE_PATH), "c", protocol=pickle.HIGHEST_PROTOCOL
+    ) as store:
+        G = store.get(key)
+    if G is not None:
+        return G
+
+    polygon = shapely.from_wkb(polygon_wkb)
+    try:
+        G = _download_road_graph(polygon, custom_filter)
+    except NetworkXPointlessConcept:
+        warnings.warn("No streets or roads could be found in the boundary")
+        return None  # Return None explicitly for clarity.
+
+    if consolidate:
+        G = ox.project_graph(G, EQUAL_AREA_EPSG)
+        # G = ox.simplification.simplify_graph(G)
+        G = ox.consolidate_intersections(G, tolerance=tolerance_m, rebuild_graph=True)
+    # after consolidation, which stretches edges to merged nodes and recomputes
+    # their lengths; speeds and travel times are CRS-independent
+    G = ox.add_edge_speeds(G)
+    G = ox.add_edge_travel_times(G)
+    if consolidate:
+        G = ox.project_graph(G, to_crs=GEODESIC_EPSG)
+
+    with _graph_store_lock, shelve.open(
+        str(GRAPH_STORE_PATH), "c", protocol=pickle.HIGHEST_PROTOCOL
+    ) as store:
+        store[key] = G
+    return G
+
+
+def road_network_from_polygon(
+    polygon, consolidate: bool = False, tolerance_m: float = 10
+) -> nx.MultiDiGraph:
     """
-    Takes a polygon (expects a geopandas geometry object) and queries the
-    osmnx API for the network of roads within the polygon.
+    Takes a polygon (a shapely geometry in lat/lon) and queries the
+    osmnx API for the network of roads within the polygon. For a GeoDataFrame,
+    use road_network_from_gdf, which handles the CRS conversion.
+
+    Intersections are only consolidated when asked for; it is the most expensive
+    step of the pipeline and shortest paths or degrees don't need it.
+
+    Finished graphs are kept in a shelve store keyed by the polygon and filter, and
+    in memory for the life of the process; copy the graph before mutating it.
 
     If the graph is empty, it returns None.
 
     Args:
-        polygon (geopandas.GeoSeries or shapely.geometry.Polygon): The input polygon to query the road network.
+        polygon (shapely.geometry.base.BaseGeometry): The input polygon (EPSG:4326) to query the road network.
+        consolidate (bool, optional): Merge nodes of complex intersections. Defaults to False.
+        tolerance_m (float, optional): Consolidation buffer distance in meters. Defaults to 10.
 
     Returns:
         nx.MultiDiGraph: The road network graph or None if no graph is available.
+
+    Raises:
+        TypeError: If polygon is not a shapely geometry.
     """
 
-    if isinstance(polygon, gpd.GeoDataFrame):
-        polygon = polygon.to_crs(epsg=GEODESIC_EPSG)
-        polygon = polygon.geometry[0]
-    try:
-        # filters the highway field using regex (removes service roads)
-        custom_filter = (
-            '["highway"~"motorway|trunk|primary|secondary|tertiary|residential"]'
+    if not isinstance(polygon, BaseGeometry):
+        raise TypeError(
+            f"Expected a shapely geometry, got {type(polygon).__name__}; "
+            "use road_network_from_gdf for GeoDataFrames."
         )
-        G = ox.graph_from_polygon(
-            polygon,
-            network_type="drive",
-            simplify=True,
-            retain_all=False,
-            custom_filter=custom_filter,
-        )
-        G = ox.project_graph(G, EQUAL_AREA_EPSG)
-        # G = ox.simplification.simplify_graph(G)
-        G = ox.consolidate_intersections(G)
-        G = ox.add_edge_speeds(G)
-        G = ox.add_edge_travel_times(G)
-        G = ox.project_graph(G, to_crs=GEODESIC_EPSG)
 
-        return G
+    polygon_wkb = polygon.wkb
+    key = _graph_cache_key(
+        polygon_wkb, DRIVE_FILTER, consolidate, tolerance_m, GRAPH_PIPELINE_VERSION
+    )
+    return _cached_road_network(
+        key, polygon_wkb, DRIVE_FILTER, consolidate, tolerance_m
+    )
 
-    except NetworkXPointlessConcept:
-        warnings.warn("No streets or roads could be found in the boundary")
-        return None  # Return None explicitly for clarity.
+
+def road_network_from_gdf(
+    gdf: gpd.GeoDataFrame, consolidate: bool = False, tolerance_m: float = 10
+) -> list[nx.MultiDiGraph]:
+    """
+    Queries the road network for every geometry in a GeoDataFrame. The frame is
+    reprojected to lat/lon once, so the whole batch shares one transformation.
+
+    Args:
+        gdf (geopandas.GeoDataFrame): Polygons to query, in any CRS.
+        consolidate (bool, optional): Merge nodes of complex intersections. Defaults to False.
+        tolerance_m (float, optional): Consolidation buffer distance in meters. Defaults to 10.
+
+    Returns:
+        list[nx.MultiDiGraph]: One road network (or None) per row, in row order.
+    """
+    geometries = gdf.to_crs(epsg=GEODESIC_EPSG).geometry
+    return [
+        road_network_from_polygon(
+            polygon, consolidate=consolidate, tolerance_m=tolerance_m
+        )
+        for polygon in geometries
+    ]
 
 
 def road_network_from_point(
-    lat: float = None, lon: float = None, point: Point = None, radius_m: int = 10_000
+    lat: float = None,
+    lon: float = None,
+    point: Point = None,
+    radius_m: int = 10_000,
+    consolidate: bool = False,
+    tolerance_m: float = 10,
 ):
     circle = create_circular_polygon(lat=lat, lon=lon, point=point, radius_m=radius_m)
 
-    G = road_network_from_polygon(circle)
+    G = road_network_from_polygon(
+        circle, consolidate=consolidate, tolerance_m=tolerance_m
+    )
     return G
 
 
@@ -145,14 +336,22 @@ def add_binary_attribute(G, node_subset, attribute_label):
     """
     Adds a binary attribute to the nodes in the graph.
 
+    G is modified in place and also returned, so calls can be chained.
+    Every node is set False in one bulk pass, then only the members of
+    node_subset are visited to set True, which is cheap for sparse subsets.
+    Nodes in node_subset that are not in G are ignored.
+
     Args:
          G (networkx.Graph): The graph to which the attribute will be added.
-         node_subset (set): A subset of nodes to be marked with the attribute.
+         node_subset (Iterable): A subset of nodes to be marked with the attribute.
          attribute_label (str): The name of the attribute to be added.
 
      Returns:
-         networkx.Graph: The graph with the added binary attribute.
+         networkx.Graph: The same graph, with the added binary attribute.
     """
-    for node in G.nodes:
-        G.nodes[node][attribute_label] = node in node_subset
-    return G
\ No newline at end of file
+    node_subset = set(node_subset)
+    nx.set_node_attributes(G, False, attribute_label)
+    nx.set_node_attributes(
+        G, {node: True for node in node_subset if node in G}, attribute_label
+    )
+    return G
@@ -0,0 +1,125 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import networkx as nx
+import pytest
+
+pytest.importorskip("osmnx")
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import street_networks  # noqa: E402
+from poi_queries import create_circular_polygon  # noqa: E402
+
+DENVER = (39.7392, -104.9903)
+
+
+def test_large_polygon_is_subdivided():
+    # a 40 km circle covers ~5,000 km2, over MAX_QUERY_AREA_KM2
+    polygon = create_circular_polygon(lat=DENVER[0], lon=DENVER[1], radius_m=40_000)
+    pieces = street_networks._subdivide_polygon(polygon)
+
+    assert len(pieces) > 1
+    # pieces come back in lat/lon, around the original polygon
+    for piece in pieces:
+        minx, miny, maxx, maxy = piece.bounds
+        assert -106 < minx < maxx < -104
+        assert 39 < miny < maxy < 41
+
+
+def test_small_polygon_is_one_piece():
+    polygon = create_circular_polygon(lat=DENVER[0], lon=DENVER[1], radius_m=10_000)
+    assert len(street_networks._subdivide_polygon(polygon)) == 1
+
+
+def test_subdivided_download_shares_overpass_slots(monkeypatch):
+    state = {"in_flight": 0, "peak": 0, "calls": []}
+    truncated = []
+    lock = threading.Lock()
+
+    def fake_graph_from_polygon(polygon, **kwargs):
+        with lock:
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+        time.sleep(0.05)
+        with lock:
+            state["in_flight"] -= 1
+            state["calls"].append(kwargs)
+        G = nx.MultiDiGraph()
+        G.add_node(id(polygon))
+        return G
+
+    monkeypatch.setattr(
+        street_networks.ox, "graph_from_polygon", fake_graph_from_polygon
+    )
+    monkeypatch.setattr(
+        street_networks.ox.truncate,
+        "truncate_graph_polygon",
+        lambda G, polygon, truncate_by_edge: truncated.append(polygon) or G,
+    )
+    monkeypatch.setattr(street_networks.ox, "simplify_graph", lambda G: G)
+    monkeypatch.setattr(
+        street_networks.ox.truncate, "largest_component", lambda G, strongly=False: G
+    )
+
+    polygon = create_circular_polygon(lat=DENVER[0], lon=DENVER[1], radius_m=40_000)
+    # hold all but one slot, as concurrent city pulls would
+    held = street_networks.OVERPASS_MAX_CONCURRENT - 1
+    for _ in range(held):
+        street_networks._overpass_slots.acquire()
+    try:
+        with pytest.warns(UserWarning, match="Overpass queries"):
+            G = street_networks._download_road_graph(
+                polygon, street_networks.DRIVE_FILTER
+            )
+    finally:
+        for _ in range(held):
+            street_networks._overpass_slots.release()
+
+    assert len(state["calls"]) > 1
+    assert all(call["truncate_by_edge"] for call in state["calls"])
+    assert state["peak"] == 1
+    assert G.number_of_nodes() == len(state["calls"])
+    # the composed graph is cut back to the caller's polygon, not the pieces
+    assert truncated == [polygon]
+
+
+def test_subdivided_download_skips_empty_pieces(monkeypatch):
+    calls = []
+    truncated = []
+    lock = threading.Lock()
+
+    def fake_graph_from_polygon(polygon, **kwargs):
+        with lock:
+            calls.append(polygon)
+            first = len(calls) == 1
+        if first:
+            raise street_networks.ox._errors.InsufficientResponseError("no ways")
+        G = nx.MultiDiGraph()
+        G.add_node(id(polygon))
+        return G
+
+    monkeypatch.setattr(
+        street_networks.ox, "graph_from_polygon", fake_graph_from_polygon
+    )
+    monkeypatch.setattr(
+        street_networks.ox.truncate,
+        "truncate_graph_polygon",
+        lambda G, polygon, truncate_by_edge: truncated.append(polygon) or G,
+    )
+    monkeypatch.setattr(street_networks.ox, "simplify_graph", lambda G: G)
+    monkeypatch.setattr(
+        street_networks.ox.truncate, "largest_component", lambda G, strongly=False: G
+    )
+
+    polygon = create_circular_polygon(lat=DENVER[0], lon=DENVER[1], radius_m=40_000)
+    with pytest.warns(UserWarning, match="Overpass queries"):
+        G = street_networks._download_road_graph(polygon, street_networks.DRIVE_FILTER)
+
+    # the empty piece is dropped, the others are still composed
+    assert len(calls) > 1
+    assert G.number_of_nodes() == len(calls) - 1
@@ -5,137 +5,180 @@ import dash_leaflet as dl
 from dash import html, dcc
 from dash.dependencies import Input, Output
 import dash_bootstrap_components as dbc
-import json
+import shapely
+from flask import send_file
+from functools import lru_cache
 
-from src.poi_queries import (
-    groceries_from_placename,
-    convenience_from_placename,
-    lowquality_from_placename,
-)
+try:
+    import orjson
+except ImportError:  # json.loads also accepts bytes
+    import json as orjson
 
-# Load GeoJSON data from file
+from src.poi_queries import pois_from_placename
 
-current_dir = os.getcwd()
-l = []
-for filename in os.listdir(current_dir):
-    filepath = os.path.join(current_dir, filename)
-    l.append(filepath)
+# Load GeoJSON data from file
+geojson_path = 'src/geo_json_test.json'
+geojson_url = '/geojson/geo_json_test.json'
+# Dev flag: embed the parsed GeoJSON in the map instead of letting the browser
+# fetch (and cache) the static file from geojson_url
+GEOJSON_INLINE = os.environ.get("GEOJSON_INLINE") == "1"
+
+# Parsed on first use rather than at import so server startup isn't blocked
+@lru_cache(maxsize=1)
+def load_geojson():
+    with open(geojson_path, 'rb') as f:
+        return orjson.loads(f.read())
+
+# Map centers for the selectable locations; also drives the dropdown options
+CENTERS = {
+    "Albany, NY": [42.6526, -73.7562],
+    "New York, NY": [40.7128, -74.0060],
+    "Denver, CO": [39.7392, -104.9903],
+    "Portland, ME": [43.6591, -70.2568],
+}
+DEFAULT_CENTER = CENTERS["Denver, CO"]
+
+def geojson_source():
+    if GEOJSON_INLINE:
+        return {"data": load_geojson()}
+    return {"url": geojson_url}
+
+# The GeoJSON layer never changes between maps, so build it once
+@lru_cache(maxsize=1)
+def geojson_layer():
+    return dl.GeoJSON(**geojson_source(), id='geojson-layer',
+                #    style= {
+                #         'fillColor': '#FFEDA0',
+                #         'weight': 1,
+                #         'opacity': 1,
+                #         'color': 'white',
+                #         'dashArray': '3',
+                #         'fillOpacity': 0.6,
+                #     }
+                    )  # Load GeoJSON data directly
 
-tex = "\n".join(l)
+LOCATION_OPTIONS = [{'label': name, 'value': name} for name in CENTERS]
 
-print("CURRREEEEENT DIR:", current_dir)
-print(tex)
+# Static map layers, built once and shared by every generated map
+TILE_LAYER = dl.TileLayer(
+    url="https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}{r}.png",
+    attribution='&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors &copy; <a href="https://carto.com/attributions">CARTO</a>',
+    maxZoom=20,
+)
+MAP_STYLE = {'width': '100%', 'height': '600px'}
 
-geojson_path = 'src/geo_json_test.json'
-with open(geojson_path) as f:
-    geojson_data = json.load(f)
+# Reference to the circle-marker renderer in assets/poi_markers.js
+poi_point_to_layer = {"variable": "testversion.poi.pointToLayer"}
 
-# Helper to convert POI GeoDataFrame to leaflet markers
+# Helper to convert POI GeoDataFrame to a single leaflet GeoJSON layer
 def poi_to_markers(poi_gdf, color, radius):
-    print("POI Geometry:", poi_gdf["geometry"].head())  # Debugging
-    markers = [
-        dl.CircleMarker(
-            center=[geom.y, geom.x],  # Extract latitude (y) and longitude (x) from the geometry
-            color=color,
-            radius=radius,
-            fill=True,
-            fillOpacity=0.5,
-        )
-        for geom in poi_gdf.geometry
-    ]
-    return markers
-
-# Function to generate a Dash Leaflet map with POIs
-def generate_map(location="Denver, CO"):
-    grocery = groceries_from_placename(location, centroids_only=True)
-    print("Grocery POIs:", grocery)  # Debugging
-
-    convenience = convenience_from_placename(location, centroids_only=True)
-    lowquality = lowquality_from_placename(location, centroids_only=True)
+    # Pull all (x, y) coordinates in one vectorized pass
+    coords = shapely.get_coordinates(poi_gdf.geometry.values).tolist()
+    feature_collection = {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": xy},
+                "properties": {},
+            }
+            for xy in coords
+        ],
+    }
+    # style is shared by the whole layer, so it lives in the hideout
+    return dl.GeoJSON(
+        data=feature_collection,
+        pointToLayer=poi_point_to_layer,
+        hideout=dict(color=color, radius=radius),
+    )
+
+# Function to generate the POI layers for a location; memoized per location so
+# revisiting a dropdown entry skips the POI query and marker building
+@lru_cache(maxsize=16)
+def generate_layers(location="Denver, CO"):
+    # one Overpass query for all three categories, split by tag client-side
+    pois = pois_from_placename(location, centroids_only=True)
+    grocery = pois["grocery"]
+    convenience = pois["convenience"]
+    lowquality = pois["lowquality"]
 
     # Create marker layers
     grocery_markers = poi_to_markers(grocery, color="#4daf4a", radius=10)
     convenience_markers = poi_to_markers(convenience, color="#377eb8", radius=7)
     lowquality_markers = poi_to_markers(lowquality, color="#e41a1c", radius=5)
 
-    # Set map center based on selected location
-    if location == "Albany, NY":
-        center = [42.6526, -73.7562]  # Albany, NY coordinates
-    elif location == "New York, NY":
-        center = [40.7128, -74.0060]  # New York, NY coordinates
-    elif location == "Denver, CO":
-        center = [39.7392, -104.9903]  # Denver, CO coordinates
-    elif location == "Portland, ME":
-        center = [43.6591, -70.2568]  # Portland, ME coordinates
-
-    # Create the map with POI markers and GeoJSON layer
-    map_component = dl.Map(center=center, zoom=12, children=[
-         dl.GeoJSON(data=geojson_data, id='geojson-layer', 
-                #    style= {
-                #         'fillColor': '#FFEDA0',
-                #         'weight': 1,
-                #         'opacity': 1,
-                #         'color': 'white',
-                #         'dashArray': '3',
-                #         'fillOpacity': 0.6,
-                #     }
-                    ),  # Load GeoJSON data directly
-        dl.TileLayer(
-            url="https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}{r}.png",
-            attribution='&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors &copy; <a href="https://carto.com/attributions">CARTO</a>',
-            maxZoom=20,
-        ),
+    return grocery_markers, convenience_markers, lowquality_markers
+
+# The map is built once per page load; callbacks only swap the POI layer
+# children and the viewport, so Leaflet keeps its tiles and GeoJSON
+def generate_map():
+    return dl.Map(id="main-map", center=DEFAULT_CENTER, zoom=12, children=[
+        geojson_layer(),
+        TILE_LAYER,
         dl.LayersControl(
             [
-                dl.Overlay(dl.LayerGroup(grocery_markers), name="Groceries", checked=True),
-                dl.Overlay(dl.LayerGroup(convenience_markers), name="Convenience", checked=True),
-                dl.Overlay(dl.LayerGroup(lowquality_markers), name="Low-quality", checked=True),
+                dl.Overlay(dl.LayerGroup(id="grocery-layer"), name="Groceries", checked=True),
+                dl.Overlay(dl.LayerGroup(id="convenience-layer"), name="Convenience", checked=True),
+                dl.Overlay(dl.LayerGroup(id="lowquality-layer"), name="Low-quality", checked=True),
             ]
         ),
-       
-    ], style={'width': '100%', 'height': '600px'})
-    
-    return map_component
+    ], style=MAP_STYLE)
 
 # Dash app setup
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 server = app.server
 
-# App layout with dropdown to select location and map
-app.layout = dbc.Container(
-    [
-        dbc.Row(
-            dbc.Col(html.H1("Grocery Store Explorer", className="text-center mb-4"))
-        ),
-        dbc.Row(
-            dbc.Col(
-                dcc.Dropdown(
-                    id="location-dropdown",
-                    options=[
-                        {'label': 'Albany, NY', 'value': 'Albany, NY'},
-                        {'label': 'New York, NY', 'value': 'New York, NY'},
-                        {'label': 'Denver, CO', 'value': 'Denver, CO'},
-                        {'label': 'Portland, ME', 'value': 'Portland, ME'},
-                    ],
-                    value="Denver, CO",
-                    className="mb-4"
+# Serve the GeoJSON as a cacheable static file; the server never parses it
+@server.route(geojson_url)
+def serve_geojson():
+    return send_file(
+        os.path.abspath(geojson_path), mimetype="application/json", max_age=86400
+    )
+
+# App layout with dropdown to select location and map; a function so the
+# GeoJSON is only loaded on the first page load, not at import
+def serve_layout():
+    return dbc.Container(
+        [
+            dbc.Row(
+                dbc.Col(html.H1("Grocery Store Explorer", className="text-center mb-4"))
+            ),
+            dbc.Row(
+                dbc.Col(
+                    dcc.Dropdown(
+                        id="location-dropdown",
+                        options=LOCATION_OPTIONS,
+                        value="Denver, CO",
+                        className="mb-4"
+                    )
                 )
-            )
-        ),
-        dbc.Row(
-            dbc.Col(html.Div(id="map-container"))
-        ),
-    ],
-    fluid=True
-)
+            ),
+            dbc.Row(
+                dbc.Col(html.Div(generate_map(), id="map-container"))
+            ),
+        ],
+        fluid=True
+    )
+
+app.layout = serve_layout
 
-# Callback to update the map based on selected location
+# Callback to update the POI layers and viewport based on selected location
 @app.callback(
-    Output("map-container", "children"),
+    Output("grocery-layer", "children"),
+    Output("convenience-layer", "children"),
+    Output("lowquality-layer", "children"),
+    Output("main-map", "viewport"),
     Input("location-dropdown", "value")
 )
 def update_map(location):
-    return generate_map(location)
+    grocery_markers, convenience_markers, lowquality_markers = generate_layers(location)
+    center = CENTERS.get(location, DEFAULT_CENTER)
+    return (
+        grocery_markers,
+        convenience_markers,
+        lowquality_markers,
+        {"center": center, "zoom": 12},
+    )
 
 # Run the app
 if __name__ == "__main__":
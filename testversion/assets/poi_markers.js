@@ -0,0 +1,17 @@
+window.testversion = Object.assign({}, window.testversion, {
+    poi: {
+        // draw each POI point as a circle marker styled by the layer's hideout
+        pointToLayer: function(feature, latlng, context) {
+            const {
+                color,
+                radius
+            } = context.hideout;
+            return L.circleMarker(latlng, {
+                radius: radius,
+                color: color,
+                fill: true,
+                fillOpacity: 0.5
+            });
+        }
+    }
+});
@@ -1,26 +1,32 @@
 import dash
 import os
-import json
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:  # json.loads also accepts bytes
+    import json as orjson
  
-import dash_html_components as html
+from dash import html
  
  
 app = dash.Dash(__name__)
 server = app.server
 
 geojson_path = 'geo_json_test.json'
-with open(geojson_path) as f:
-    geojson_data = json.load(f)
+
+# Parsed on first page load rather than at import
+@lru_cache(maxsize=1)
+def load_geojson():
+    with open(geojson_path, 'rb') as f:
+        return orjson.loads(f.read())
  
-current_dir = os.getcwd()
-l = []
-for filename in os.listdir(current_dir):
-    filepath = os.path.join(current_dir, filename)
-    l.append(filepath)
+# Dash calls a function layout on each page load
+def serve_layout():
+    return html.H1(children=[os.getcwd(), load_geojson()])
 
-tex = "\n".join(l)
 
-app.layout = html.H1(children=[os.getcwd(), tex, geojson_data])
+app.layout = serve_layout
 
 
 if __name__ == '__main__':